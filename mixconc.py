@@ -1,12 +1,14 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Frame, PageTemplate
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.pagesizes import A4
 from reportlab.lib import colors
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.cidfonts import UnicodeCIDFont
-import tempfile
+import copy
+import io
 import time
 
 # =========================
@@ -16,7 +18,7 @@ APP_VERSION = "v1.2"
 st.set_page_config(page_title="液体混合计算器", page_icon="🧪", layout="wide")
 
 # CSS 样式优化
-st.markdown("""
+_CSS_HTML = """
     <style>
     /* 0. 顶部留白调整：减少主容器顶部的 padding */
     .block-container {
@@ -77,23 +79,47 @@ st.markdown("""
         text-align: center !important;
     }
     </style>
-    """, unsafe_allow_html=True)
+    """
+
+st.markdown(_CSS_HTML, unsafe_allow_html=True)
 
 # =========================
 # 2. PDF 字体注册
 # =========================
-try:
-    pdfmetrics.registerFont(UnicodeCIDFont('STSong-Light'))
-    FONT_NAME = 'STSong-Light'
-except Exception as e:
-    FONT_NAME = 'Helvetica'
+@st.cache_resource
+def _register_font():
+    """注册中文字体 (每个进程仅执行一次)，失败时回退到 Helvetica"""
+    try:
+        pdfmetrics.registerFont(UnicodeCIDFont('STSong-Light'))
+        return 'STSong-Light'
+    except Exception:
+        return 'Helvetica'
+
+FONT_NAME = _register_font()
+
+@st.cache_resource
+def _pdf_styles(font_name):
+    """PDF 段落样式 (每个进程仅构建一次)：(标题, 小节, 居中正文, 左对齐正文)"""
+    styles = getSampleStyleSheet()
+    style_title = ParagraphStyle('TitleCN', parent=styles['Title'], fontName=font_name, fontSize=22, spaceAfter=20)
+    style_h2 = ParagraphStyle('H2CN', parent=styles['Heading2'], fontName=font_name, fontSize=14, spaceBefore=15, spaceAfter=10)
+    style_normal = ParagraphStyle('NormalCN', parent=styles['Normal'], fontName=font_name, fontSize=10, leading=14, alignment=1) # 1=Center
+    style_left = ParagraphStyle('LeftCN', parent=styles['Normal'], fontName=font_name, fontSize=10, leading=14)
+    return style_title, style_h2, style_normal, style_left
+
+@st.cache_resource
+def _pdf_section_headings(font_name):
+    """报告中固定不变的三个小节标题 (每个进程仅解析一次，使用时 copy.copy 一份)"""
+    style_h2 = _pdf_styles(font_name)[1]
+    return (Paragraph("1. 环境与目标", style_h2),
+            Paragraph("2. 混合结果总览", style_h2),
+            Paragraph("3. 详细配方表", style_h2))
 
 # =========================
 # 3. 核心工具函数
 # =========================
 MASS_UNIT_TO_G = {"μg": 1e-6, "mg": 1e-3, "g": 1.0, "kg": 1e3}
 VOL_UNIT_TO_ML = {"μL": 1e-3, "mL": 1.0, "L": 1000.0}
-CONC_MASS_UNIT_TO_G_PER_L = {"μg/L": 1e-6, "mg/L": 1e-3, "g/L": 1.0}
 
 def get_water_density(t):
     return 1.0 - 0.0003 * (t - 4)
@@ -109,38 +135,40 @@ def auto_format_solute(mass_g):
     elif mass_g < 1.0: return f"{mass_g * 1e3:.3f} mg"
     else: return f"{mass_g:.3f} g"
 
-def calculate_solute_mass(conc, unit, molar_mass, density, total_mass_g):
-    """计算溶质绝对质量(g)"""
-    if unit in CONC_MASS_UNIT_TO_G_PER_L:
-        vol_L = (total_mass_g / density) / 1000.0
-        conc_g_L = conc * CONC_MASS_UNIT_TO_G_PER_L[unit]
-        return conc_g_L * vol_L
-    elif unit in ["mmol/L", "mol/L"]:
-        vol_L = (total_mass_g / density) / 1000.0
-        factor = 1e-3 if unit == "mmol/L" else 1.0
-        return (conc * factor) * vol_L * molar_mass
-    elif unit == "% (w/w)":
-        return (conc / 100.0) * total_mass_g
-    elif unit == "% (v/v)":
-        vol_total = total_mass_g / density
-        vol_solute = (conc / 100.0) * vol_total
-        return vol_solute * density 
-    return 0.0
+# 浓度单位 -> 溶质质量(g) 计算式 (conc, molar_mass, density, total_mass_g)，标量与数组通用
+_SOLUTE_DISPATCH = {
+    "μg/L": lambda c, mm, d, tm: (c * 1e-6) * ((tm / d) / 1000.0),
+    "mg/L": lambda c, mm, d, tm: (c * 1e-3) * ((tm / d) / 1000.0),
+    "g/L": lambda c, mm, d, tm: (c * 1.0) * ((tm / d) / 1000.0),
+    "mmol/L": lambda c, mm, d, tm: (c * 1e-3) * ((tm / d) / 1000.0) * mm,
+    "mol/L": lambda c, mm, d, tm: (c * 1.0) * ((tm / d) / 1000.0) * mm,
+    "% (w/w)": lambda c, mm, d, tm: (c / 100.0) * tm,
+    "% (v/v)": lambda c, mm, d, tm: ((c / 100.0) * (tm / d)) * d,
+}
+
+def _solute_mass_vec(arr_conc, unit, arr_mm, arr_dens, arr_mass):
+    """计算各组分溶质绝对质量(g)：按单位查表一次，返回数组"""
+    func = _SOLUTE_DISPATCH.get(unit)
+    if func is None: return np.zeros_like(arr_mass)
+    return func(arr_conc, arr_mm, arr_dens, arr_mass)
+
+# 目标浓度单位 -> 换算式 (solute_g, total_mass_g, total_vol_L, ref_molar_mass)
+_CONVERT_DISPATCH = {
+    "% (w/w)": lambda s, tm, tv, mm: (s / tm) * 100.0,
+    "% (v/v)": lambda s, tm, tv, mm: (s / tm) * 100.0,
+    "g/L": lambda s, tm, tv, mm: s / tv,
+    "mg/L": lambda s, tm, tv, mm: (s * 1000) / tv,
+    "μg/L": lambda s, tm, tv, mm: (s * 1e6) / tv,
+    "mol/L": lambda s, tm, tv, mm: (s / mm) / tv,
+    "mmol/L": lambda s, tm, tv, mm: ((s / mm) * 1000) / tv,
+}
 
 def convert_solute_to_target_unit(solute_g, total_mass_g, total_vol_ml, target_unit, ref_molar_mass):
     """换算回目标浓度单位"""
     if total_mass_g <= 1e-9 or total_vol_ml <= 1e-9: return 0.0
-    
-    if target_unit == "% (w/w)": return (solute_g / total_mass_g) * 100.0 
-    if target_unit == "% (v/v)": return (solute_g / total_mass_g) * 100.0 
-
-    total_vol_L = total_vol_ml / 1000.0
-    if target_unit == "g/L": return solute_g / total_vol_L
-    elif target_unit == "mg/L": return (solute_g * 1000) / total_vol_L
-    elif target_unit == "μg/L": return (solute_g * 1e6) / total_vol_L
-    elif target_unit == "mol/L": return (solute_g / ref_molar_mass) / total_vol_L
-    elif target_unit == "mmol/L": return ((solute_g / ref_molar_mass) * 1000) / total_vol_L
-    return 0.0
+    func = _CONVERT_DISPATCH.get(target_unit)
+    if func is None: return 0.0
+    return func(solute_g, total_mass_g, total_vol_ml / 1000.0, ref_molar_mass)
 
 def solve_two_component_mixture(c1, d1, c2, d2, target_vol_ml, target_conc, unit):
     """解二元混合方程"""
@@ -166,6 +194,97 @@ def solve_two_component_mixture(c1, d1, c2, d2, target_vol_ml, target_conc, unit
         m1 = m2 * ratio_m1_m2
         return (m1, m2), None
 
+@st.cache_data(max_entries=128)
+def _render_styled_table_html(rows_tuple, mass_unit):
+    """渲染全居中的配方表 HTML (rows_tuple: 已格式化的配方表行)"""
+    columns = ["组分名称", "原始浓度", "密度 (g/mL)", f"加入质量 ({mass_unit})", "含溶质 (智能单位)"] # 修改为“加入质量”
+    display_df = pd.DataFrame(list(rows_tuple), columns=columns)
+
+    # 使用 Styler 全居中
+    styler = display_df.style.set_properties(**{'text-align': 'center'}) \
+                             .set_table_styles([
+                                 dict(selector='th', props=[('text-align', 'center')]),
+                                 dict(selector='td', props=[('text-align', 'center')])
+                             ])
+    return styler.to_html()
+
+# =========================
+# PDF 报告生成
+# =========================
+def footer_canvas(canvas, doc):
+    canvas.saveState()
+    canvas.setFont('Helvetica', 9)
+    canvas.setFillColor(colors.lightgrey)
+    w, h = A4
+    canvas.drawRightString(w - 30, 20, f"Generated by {APP_VERSION}")
+    canvas.restoreState()
+
+@st.cache_data(max_entries=128, show_spinner=False)
+def build_pdf_bytes(exp_name, gen_time, room_temp, d_water, d_saline, conc_unit, vol_unit, mass_unit,
+                    display_mass, display_vol, display_density, display_conc, rows_tuple):
+    """生成 PDF 报告字节流 (rows_tuple: 已格式化的配方表行)"""
+    buf = io.BytesIO()
+    doc = SimpleDocTemplate(buf, pagesize=A4)
+    frame = Frame(doc.leftMargin, doc.bottomMargin, doc.width, doc.height, id='normal')
+    template = PageTemplate(id='test', frames=frame, onPage=footer_canvas)
+    doc.addPageTemplates([template])
+    style_title, _, style_normal, style_left = _pdf_styles(FONT_NAME)
+    sec_env, sec_result, sec_table = _pdf_section_headings(FONT_NAME)
+
+    elements = []
+    elements.append(Paragraph(f"实验报告：{exp_name}", style_title))
+    elements.append(Paragraph(f"生成时间: {gen_time}", style_normal))
+    elements.append(Spacer(1, 15))
+    
+    elements.append(copy.copy(sec_env))
+    env_text = f"""
+    <b>室温:</b> {room_temp} ℃ <br/>
+    <b>目标单位:</b> {conc_unit} (浓度) | {vol_unit} (体积)<br/>
+    <b>参考密度:</b> 纯水 ({d_water:.4f} g/mL) | 生理盐水 ({d_saline:.4f} g/mL)
+    """
+    elements.append(Paragraph(env_text, style_left))
+    
+    elements.append(copy.copy(sec_result))
+    res_text = f"""
+    <b>总质量:</b> {display_mass:.2f} {mass_unit}<br/>
+    <b>总体积:</b> {display_vol:.2f} {vol_unit}<br/>
+    <b>混合密度:</b> {display_density:.4f} g/mL<br/>
+    <b>混合浓度:</b> {display_conc:.3f} {conc_unit}
+    """
+    elements.append(Paragraph(res_text, style_left))
+    
+    elements.append(copy.copy(sec_table))
+    # 修改PDF表头为“加入质量”
+    headers = ["组分", f"原始浓度", f"密度\n(g/mL)", f"加入质量\n({mass_unit})", "含溶质\n(自动单位)"]
+    data = [headers] + [list(r) for r in rows_tuple]
+
+    t = Table(data, colWidths=[90, 80, 80, 90, 100])
+    t.setStyle(TableStyle([
+        ('FONTNAME', (0,0), (-1,-1), FONT_NAME),
+        ('GRID', (0,0), (-1,-1), 0.5, colors.grey),
+        ('BACKGROUND', (0,0), (-1,0), colors.HexColor("#e6e6e6")),
+        ('ALIGN', (0,0), (-1,-1), 'CENTER'),
+        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+    ]))
+    elements.append(t)
+    doc.build(elements)
+    return buf.getvalue()
+
+@st.fragment
+def _pdf_fragment(rows_tuple, exp_name, room_temp, d_water, d_saline, conc_unit, vol_unit, mass_unit,
+                  display_mass, display_vol, display_density, display_conc):
+    """PDF 导出按钮区域，点击时只重跑本片段"""
+    col_btn, col_empty = st.columns([1, 4])
+    with col_btn:
+        if st.button("📥 生成 PDF 报告", type="primary"):
+            try:
+                pdf_bytes = build_pdf_bytes(exp_name, time.strftime('%Y-%m-%d %H:%M'), room_temp, d_water, d_saline,
+                                            conc_unit, vol_unit, mass_unit,
+                                            display_mass, display_vol, display_density, display_conc, rows_tuple)
+                st.download_button(f"下载PDF报告", data=pdf_bytes, file_name=f"{exp_name}.pdf", mime="application/pdf")
+            except Exception as e:
+                st.error(f"PDF生成错误: {e}")
+
 # =========================
 # 4. 侧边栏：输入区域
 # =========================
@@ -189,6 +308,9 @@ with st.sidebar:
         with c_unit3:
             # 体积默认 μL (index 0)
             vol_unit = st.selectbox("体积单位", ["μL", "mL", "L"], index=0)
+        # 单位换算系数在整个脚本中不变，这里取一次
+        mass_factor = MASS_UNIT_TO_G[mass_unit]
+        vol_factor = VOL_UNIT_TO_ML[vol_unit]
             
         material_count = st.number_input("混合组分数量", 2, 10, 2)
 
@@ -202,7 +324,7 @@ with st.sidebar:
     with c_tgt2:
         target_conc_input = st.number_input(f"目标浓度 ({conc_unit})", min_value=0.0, value=0.0, step=0.1)
     
-    target_vol_ml = target_vol_input * VOL_UNIT_TO_ML[vol_unit]
+    target_vol_ml = target_vol_input * vol_factor
     is_auto_solve_mode = (target_vol_ml > 0 and target_conc_input > 0)
     
     if is_auto_solve_mode:
@@ -217,7 +339,7 @@ with st.sidebar:
 
     st.markdown("---")
     st.markdown("#### 📝 组分参数录入")
-    materials_input = []
+    concs, masses, densities, molar_masses = [], [], [], []
     ref_molar_mass = 58.44 
 
     for i in range(int(material_count)):
@@ -250,53 +372,49 @@ with st.sidebar:
             if i == 0: ref_molar_mass = mm
         
         st.markdown("<hr style='margin: 5px 0; border-top: 1px dashed #ddd;'>", unsafe_allow_html=True)
-        materials_input.append({"id": i, "conc": conc, "mass": mass, "density": dens, "molar_mass": mm})
+        concs.append(conc)
+        masses.append(mass)
+        densities.append(dens)
+        molar_masses.append(mm)
 
 # =========================
 # 5. 主逻辑计算
 # =========================
-final_materials = []
 solve_error_msg = None
-
+arr_conc = np.array(concs, dtype=np.float64)
+arr_dens = np.array(densities, dtype=np.float64)
+arr_mm = np.array(molar_masses, dtype=np.float64)
+arr_mass = np.array(masses, dtype=np.float64) * mass_factor
+n_materials = len(arr_conc)
+mass_g = None
+
+# 各模式只负责求出各组分加入质量(g)，体积与溶质质量统一计算
 if is_valid_solve:
-    m1_conc, m1_dens = materials_input[0]["conc"], materials_input[0]["density"]
-    m2_conc, m2_dens = materials_input[1]["conc"], materials_input[1]["density"]
-    solved_masses_g, err = solve_two_component_mixture(m1_conc, m1_dens, m2_conc, m2_dens, target_vol_ml, target_conc_input, conc_unit)
+    solved_masses_g, err = solve_two_component_mixture(concs[0], densities[0], concs[1], densities[1], target_vol_ml, target_conc_input, conc_unit)
     if err:
         solve_error_msg = err
     else:
-        for idx, item in enumerate(materials_input):
-            calc_mass_g = solved_masses_g[idx]
-            calc_vol_mL = calc_mass_g / item["density"]
-            solute_g = calculate_solute_mass(item["conc"], conc_unit, item["molar_mass"], item["density"], calc_mass_g)
-            final_materials.append({**item, "质量(g)": calc_mass_g, "体积(mL)": calc_vol_mL, "溶质质量(g)": solute_g})
-
+        mass_g = np.array(solved_masses_g, dtype=np.float64)
 elif target_vol_ml > 0 and not is_valid_solve:
-    base_vol = sum([ (item["mass"] * MASS_UNIT_TO_G[mass_unit]) / item["density"] for item in materials_input ])
+    base_vol = float((arr_mass / arr_dens).sum())
     scaling_factor = target_vol_ml / base_vol if base_vol > 0 else 0
-    for item in materials_input:
-        req_m_g = (item["mass"] * MASS_UNIT_TO_G[mass_unit]) * scaling_factor
-        solute_g = calculate_solute_mass(item["conc"], conc_unit, item["molar_mass"], item["density"], req_m_g)
-        final_materials.append({**item, "质量(g)": req_m_g, "体积(mL)": req_m_g/item["density"], "溶质质量(g)": solute_g})
+    mass_g = arr_mass * scaling_factor
 else:
-    for item in materials_input:
-        m_g = item["mass"] * MASS_UNIT_TO_G[mass_unit]
-        solute_g = calculate_solute_mass(item["conc"], conc_unit, item["molar_mass"], item["density"], m_g)
-        final_materials.append({**item, "质量(g)": m_g, "体积(mL)": m_g/item["density"], "溶质质量(g)": solute_g})
-
-df = pd.DataFrame(final_materials)
+    mass_g = arr_mass
 
-if not df.empty:
-    theo_mass_g = df["质量(g)"].sum()
-    theo_solute_g = df["溶质质量(g)"].sum()
-    theo_vol_ml = df["体积(mL)"].sum()
-    
-    display_mass = theo_mass_g / MASS_UNIT_TO_G[mass_unit]
-    display_vol = theo_vol_ml / VOL_UNIT_TO_ML[vol_unit]
-    display_density = theo_mass_g / theo_vol_ml if theo_vol_ml > 0 else 0
-    display_conc = convert_solute_to_target_unit(theo_solute_g, theo_mass_g, theo_vol_ml, conc_unit, ref_molar_mass)
+if mass_g is not None and mass_g.any():
+    vol_ml = mass_g / arr_dens
+    solute_g = _solute_mass_vec(arr_conc, conc_unit, arr_mm, arr_dens, mass_g)
+    theo_mass_g, theo_vol_ml, theo_solute_g = float(mass_g.sum()), float(vol_ml.sum()), float(solute_g.sum())
 else:
-    display_mass, display_vol, display_density, display_conc = 0,0,0,0
+    # 求解失败，或各组分质量均为 0：跳过计算，直接显示零值
+    vol_ml = solute_g = np.zeros(n_materials)
+    theo_mass_g, theo_vol_ml, theo_solute_g = 0.0, 0.0, 0.0
+
+display_mass = theo_mass_g / mass_factor
+display_vol = theo_vol_ml / vol_factor
+display_density = theo_mass_g / theo_vol_ml if theo_vol_ml > 0 else 0
+display_conc = convert_solute_to_target_unit(theo_solute_g, theo_mass_g, theo_vol_ml, conc_unit, ref_molar_mass)
 
 # =========================
 # 6. 主界面显示
@@ -327,111 +445,18 @@ else:
 
     # 2. 详细配方表
     st.subheader("📋 详细配方表")
-    
-    display_data = []
-    for _, row in df.iterrows():
-        req_mass_val = row["质量(g)"] / MASS_UNIT_TO_G[mass_unit]
-        solute_str = auto_format_solute(row["溶质质量(g)"])
-        
-        display_data.append({
-            "组分名称": f"组分 {int(row['id'])+1}",
-            "原始浓度": f"{row['conc']}",
-            "密度 (g/mL)": f"{row['density']:.4f}",
-            f"加入质量 ({mass_unit})": f"{req_mass_val:.2f}", # 修改为“加入质量”
-            "含溶质 (智能单位)": solute_str
-        })
-    
-    display_df = pd.DataFrame(display_data)
-    
-    # 使用 Styler 全居中
-    styler = display_df.style.set_properties(**{'text-align': 'center'}) \
-                             .set_table_styles([
-                                 dict(selector='th', props=[('text-align', 'center')]),
-                                 dict(selector='td', props=[('text-align', 'center')])
-                             ])
-    
-    st.table(styler)
+
+    rows_tuple = tuple(zip(
+        [f"组分 {i+1}" for i in range(n_materials)],
+        [f"{c}" for c in arr_conc],
+        [f"{d:.4f}" for d in arr_dens],
+        [f"{m:.2f}" for m in mass_g / mass_factor],
+        [auto_format_solute(x) for x in solute_g]
+    ))
+    st.markdown(_render_styled_table_html(rows_tuple, mass_unit), unsafe_allow_html=True)
 
     # 3. PDF 导出
     st.divider()
-    
-    def footer_canvas(canvas, doc):
-        canvas.saveState()
-        canvas.setFont('Helvetica', 9)
-        canvas.setFillColor(colors.lightgrey)
-        w, h = A4
-        canvas.drawRightString(w - 30, 20, f"Generated by {APP_VERSION}")
-        canvas.restoreState()
-
-    def generate_pdf():
-        tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".pdf")
-        doc = SimpleDocTemplate(tmp.name, pagesize=A4)
-        frame = Frame(doc.leftMargin, doc.bottomMargin, doc.width, doc.height, id='normal')
-        template = PageTemplate(id='test', frames=frame, onPage=footer_canvas)
-        doc.addPageTemplates([template])
-
-        styles = getSampleStyleSheet()
-        style_title = ParagraphStyle('TitleCN', parent=styles['Title'], fontName=FONT_NAME, fontSize=22, spaceAfter=20)
-        style_h2 = ParagraphStyle('H2CN', parent=styles['Heading2'], fontName=FONT_NAME, fontSize=14, spaceBefore=15, spaceAfter=10)
-        style_normal = ParagraphStyle('NormalCN', parent=styles['Normal'], fontName=FONT_NAME, fontSize=10, leading=14, alignment=1) # 1=Center
-        style_left = ParagraphStyle('LeftCN', parent=styles['Normal'], fontName=FONT_NAME, fontSize=10, leading=14)
-
-        elements = []
-        elements.append(Paragraph(f"实验报告：{exp_name}", style_title))
-        elements.append(Paragraph(f"生成时间: {time.strftime('%Y-%m-%d %H:%M')}", style_normal))
-        elements.append(Spacer(1, 15))
-        
-        elements.append(Paragraph("1. 环境与目标", style_h2))
-        env_text = f"""
-        <b>室温:</b> {room_temp} ℃ <br/>
-        <b>目标单位:</b> {conc_unit} (浓度) | {vol_unit} (体积)<br/>
-        <b>参考密度:</b> 纯水 ({d_water:.4f} g/mL) | 生理盐水 ({d_saline:.4f} g/mL)
-        """
-        elements.append(Paragraph(env_text, style_left))
-        
-        elements.append(Paragraph("2. 混合结果总览", style_h2))
-        res_text = f"""
-        <b>总质量:</b> {display_mass:.2f} {mass_unit}<br/>
-        <b>总体积:</b> {display_vol:.2f} {vol_unit}<br/>
-        <b>混合密度:</b> {display_density:.4f} g/mL<br/>
-        <b>混合浓度:</b> {display_conc:.3f} {conc_unit}
-        """
-        elements.append(Paragraph(res_text, style_left))
-        
-        elements.append(Paragraph("3. 详细配方表", style_h2))
-        # 修改PDF表头为“加入质量”
-        headers = ["组分", f"原始浓度", f"密度\n(g/mL)", f"加入质量\n({mass_unit})", "含溶质\n(自动单位)"]
-        data = [headers]
-        for _, row in df.iterrows():
-            req_mass = row["质量(g)"] / MASS_UNIT_TO_G[mass_unit]
-            solute_str = auto_format_solute(row["溶质质量(g)"])
-            data.append([
-                f"组分 {int(row['id'])+1}",
-                f"{row['conc']}",
-                f"{row['density']:.4f}",
-                f"{req_mass:.2f}",
-                solute_str
-            ])
-            
-        t = Table(data, colWidths=[90, 80, 80, 90, 100])
-        t.setStyle(TableStyle([
-            ('FONTNAME', (0,0), (-1,-1), FONT_NAME),
-            ('GRID', (0,0), (-1,-1), 0.5, colors.grey),
-            ('BACKGROUND', (0,0), (-1,0), colors.HexColor("#e6e6e6")),
-            ('ALIGN', (0,0), (-1,-1), 'CENTER'),
-            ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-        ]))
-        elements.append(t)
-        doc.build(elements)
-        return tmp.name
-
-    col_btn, col_empty = st.columns([1, 4])
-    with col_btn:
-        if st.button("📥 生成 PDF 报告", type="primary"):
-            try:
-                path = generate_pdf()
-                with open(path, "rb") as f:
-                    st.download_button(f"下载PDF报告", data=f, file_name=f"{exp_name}.pdf", mime="application/pdf")
-            except Exception as e:
-                st.error(f"PDF生成错误: {e}")
 
+    _pdf_fragment(rows_tuple, exp_name, room_temp, d_water, d_saline, conc_unit, vol_unit, mass_unit,
+                  display_mass, display_vol, display_density, display_conc)